@@ -0,0 +1,4 @@
+import os
+
+# fake_api 在导入时读取该环境变量，测试中不会真正调用API
+os.environ.setdefault("hub_api_key", "test-key")
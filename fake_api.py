@@ -1,17 +1,98 @@
+import argparse
+import asyncio
 import json
 import re
 import os
-from typing import Dict, List, Union, Any
-
-from openai import OpenAI
-from tenacity import retry, wait_random_exponential, stop_after_attempt
+import random
+import time
+from typing import Dict, List, Optional, Type, Union, Any
+
+from openai import (APIConnectionError, APITimeoutError, AsyncOpenAI,
+                    DefaultAsyncHttpxClient, DefaultHttpxClient,
+                    InternalServerError, OpenAI, RateLimitError)
+from pydantic import BaseModel, ValidationError
+from tenacity import (retry, retry_if_exception_type, stop_after_attempt,
+                      wait_random_exponential)
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import h2  # noqa: F401  httpx 的 HTTP/2 支持依赖 h2
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+import llm_cache
+
 load_dotenv()
 
 os.environ['OPENAI_API_KEY'] = os.getenv("hub_api_key")
 os.environ['OPENAI_BASE_URL'] = "https://api.openai-hub.com/v1"
-client = OpenAI()
+# 连接池大小沿用SDK默认值，安装了 h2 时启用 HTTP/2 多路复用
+client = OpenAI(http_client=DefaultHttpxClient(http2=_HTTP2))
+
+DEFAULT_MODEL = os.getenv("MEMGRAPH_MODEL", "gpt-4o-mini")
+# 使用默认模型时，反馈重试的最后一次改用更强的模型
+FALLBACK_MODEL = os.getenv("MEMGRAPH_FALLBACK_MODEL", "gpt-4o")
+# 缓存条目的存储格式版本：改变写入 llm_cache 的内容（目前为原始响应文本）
+# 或 _postprocess 读取它的方式时更新，使旧格式的条目不再被读取
+CACHE_VERSION = "v1"
+# 手动清除缓存用：缓存键已包含完整消息，修改提示模板无需更新此值；
+# 只在提示和存储格式都不变、但需要重新采样（如服务端模型更新）时修改
+PROMPT_VERSION = "v1"
+# 未命中缓存的请求数低于该值时直接并发调用，不走Batch API
+BATCH_MIN_REQUESTS = 1000
+# JSON响应解析或校验失败时，带错误反馈重试的最大次数
+FEEDBACK_ATTEMPTS = 3
+# 可以重试的临时性API错误
+_TRANSIENT_ERRORS = (APIConnectionError, APITimeoutError, RateLimitError,
+                     InternalServerError)
+
+# 提示模板在导入时构造一次，静态部分在前、动态字段在后，便于命中服务端的提示前缀缓存
+_FEEDBACK_PROMPT = "Fix your previous output and retry. Your output had error: {error}"
+_SIMILAR_WORDS_PROMPT = """请以以下JSON格式回复:
+```json
+{{
+  "similar_words": ["coding", "development", ...]
+}}
+```
+
+请提供与"{word}"类似的词。"""
+
+_JSON_FENCE_RE = re.compile(r'```json\s*({.*?})\s*```', re.DOTALL)
+_LIST_OBJECT_RE = re.compile(r'\{\s*"[^"]+"\s*:\s*\[(.*?)\]\s*\}')
+_QUOTED_RE = re.compile(r'^([\'"])(.*)\1$')
+
+
+class OutputValidationError(ValueError):
+    """带反馈重试后模型输出仍未通过 schema 校验。"""
+
+    def __init__(self, error: str, content: Optional[str]):
+        super().__init__(f"Model output failed validation: {error}")
+        self.error = error
+        self.content = content
+
+
+def _json_loads(data: Union[str, bytes]) -> Any:
+    """解析Batch API的JSONL行，已安装 orjson 时使用 orjson。
+
+    模型输出的校验始终使用标准库 json，orjson 会拒绝 NaN 和超过64位的整数，
+    不能让结果有效与否取决于是否安装了 orjson。
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any) -> str:
+    """序列化Batch API的JSONL行，已安装 orjson 时使用 orjson。"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
 
 
 def message_template(role: str, content: str) -> Dict[str, str]:
@@ -27,24 +108,111 @@ def message_template(role: str, content: str) -> Dict[str, str]:
     return {'role': role, 'content': content}
 
 
-@retry(wait=wait_random_exponential(multiplier=1, max=40),
+def _cache_key(messages: List[Dict[str, str]], mode: str, model: str,
+               temperature: float) -> str:
+    """根据模型、模式和完整消息计算缓存键。"""
+    return llm_cache.make_key(
+        CACHE_VERSION, PROMPT_VERSION, model, mode, repr(float(temperature)),
+        json.dumps(messages, ensure_ascii=False, sort_keys=True))
+
+
+def _cacheable(use_cache: bool, temperature: float) -> bool:
+    """只缓存确定性的请求，temperature 大于 0 时每次都应重新采样。"""
+    return use_cache and temperature == 0
+
+
+def _request_params(messages: List[Dict[str, str]], mode: str, model: str,
+                    temperature: float,
+                    schema: Optional[Type[BaseModel]] = None) -> Dict[str, Any]:
+    """构造非流式模式的请求参数，同时用作Batch API每行的请求体。"""
+    params = {'model': model, 'messages': messages,
+              'temperature': temperature}
+    if mode == "json" and schema is not None:
+        params['response_format'] = {
+            "type": "json_schema",
+            "json_schema": {"name": schema.__name__,
+                            "schema": schema.model_json_schema()}}
+    elif mode == "json":
+        params['response_format'] = {"type": "json_object"}
+    elif mode == 'json_few_shot':
+        params['max_tokens'] = 2560
+    return params
+
+
+def _create(messages: List[Dict[str, str]], mode: str, model: str,
+            temperature: float, schema: Optional[Type[BaseModel]] = None) -> str:
+    """调用OpenAI API并返回响应文本（非流式模式）。"""
+    response = client.chat.completions.create(
+        **_request_params(messages, mode, model, temperature, schema))
+    return response.choices[0].message.content
+
+
+def _postprocess(content: str, mode: str, verbose: bool = False,
+                 schema: Optional[Type[BaseModel]] = None):
+    """按模式处理响应文本。
+
+    Returns:
+        (处理后的结果, 错误信息) 元组，结果有效时错误信息为 None，
+        无效结果不会写入缓存
+    """
+    if mode in ("json", "json_few_shot") and not content:
+        # 结构化输出被拒答或触发内容过滤时 content 为 None
+        return content, "Empty response (refusal or content filter)"
+    if mode == "json":
+        try:
+            data = json.loads(content)
+        except ValueError as e:
+            return content, f"Invalid JSON: {e}"
+    elif mode == 'json_few_shot':
+        if verbose:
+            print(content)
+        data = extract_json_and_similar_words(content)
+        if "error" in data:
+            return data, data["error"]
+    else:
+        return content, None
+
+    if schema is None:
+        return (content if mode == "json" else data), None
+    try:
+        return schema.model_validate(data), None
+    except ValidationError as err:
+        return data, str(err)
+
+
+@retry(retry=retry_if_exception_type(_TRANSIENT_ERRORS),
+       wait=wait_random_exponential(multiplier=1, max=40),
        stop=stop_after_attempt(3))
 def chat_single(messages: List[Dict[str, str]],
                 mode: str = "",
-                model: str = 'gpt-4o',
+                model: str = DEFAULT_MODEL,
                 temperature: float = 0,
-                verbose: bool = False):
+                verbose: bool = False,
+                use_cache: bool = True,
+                schema: Optional[Type[BaseModel]] = None):
     """发送单个聊天请求到OpenAI API。
 
+    temperature 为 0 的非流式请求会按内容寻址缓存到磁盘，相同请求再次调用时
+    直接读取缓存，不再调用API。JSON模式下解析或校验失败时，会把错误信息作为
+    新消息反馈给模型并重试，最多 FEEDBACK_ATTEMPTS 次；使用默认模型时最后一次
+    改用 FALLBACK_MODEL。
+
     Args:
         messages: 消息列表
         mode: 响应模式 ('stream', 'json', 'json_few_shot', 或空字符串为普通模式)
         model: 要使用的模型
         temperature: 温度参数，控制响应随机性
         verbose: 是否打印详细信息
+        use_cache: 是否使用磁盘缓存（只缓存 temperature 为 0 的非流式请求）
+        schema: 用于校验JSON响应的Pydantic模型，提供时返回该模型的实例，
+            json 模式下同时启用服务端结构化输出
 
     Returns:
         根据模式返回不同类型的响应
+
+    Raises:
+        OutputValidationError: 提供了 schema 且重试次数用尽后输出仍无效，
+            异常中带有最后一次的错误信息和模型输出
     """
     if mode == "stream":
         response = client.chat.completions.create(
@@ -55,32 +223,289 @@ def chat_single(messages: List[Dict[str, str]],
             max_tokens=2560
         )
         return response
-    elif mode == "json":
-        response = client.chat.completions.create(
-            model=model,
-            response_format={"type": "json_object"},
-            temperature=temperature,
-            messages=messages
-        )
-        return response.choices[0].message.content
-    elif mode == 'json_few_shot':
-        response = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            temperature=0,
-            max_tokens=2560
-        )
-        result = response.choices[0].message.content
+
+    if mode == 'json_few_shot':
+        temperature = 0
+
+    key = (_cache_key(messages, mode, model, temperature)
+           if _cacheable(use_cache, temperature) else None)
+    if key is not None:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            result, error = _postprocess(cached, mode, verbose, schema)
+            if error is None:
+                return result
+            llm_cache.evict(key)
+
+    attempts = FEEDBACK_ATTEMPTS if mode in ('json', 'json_few_shot') else 1
+    for attempt in range(attempts):
+        # 只有调用方使用默认模型时才在最后一次升级，避免把更强的模型降级
+        use_model = (FALLBACK_MODEL
+                     if attempts > 1 and attempt == attempts - 1
+                     and model == DEFAULT_MODEL else model)
+        content = _create(messages, mode, use_model, temperature, schema)
+        result, error = _postprocess(content, mode, verbose, schema)
+        if error is None:
+            # 备用模型的输出不写入按主模型计算的缓存键
+            # 内容过滤或拒答时 content 为 None，不写入缓存
+            if (key is not None and use_model == model
+                    and isinstance(content, str)):
+                llm_cache.set(key, content)
+            return result
         if verbose:
-            print(result)
-        return extract_json_and_similar_words(result)
-    else:
-        response = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            temperature=temperature,
-        )
-        return response.choices[0].message.content
+            print(f"Attempt {attempt + 1} failed: {error}")
+        if attempt == attempts - 1:
+            break
+        messages = messages + [
+            message_template('assistant', content or ''),
+            message_template('user', _FEEDBACK_PROMPT.format_map(
+                {'error': error})),
+        ]
+        time.sleep(1.0 * (attempt + 1))
+    if schema is not None:
+        raise OutputValidationError(error, content)
+    return result
+
+
+def _lookup_cache(messages_list: List[List[Dict[str, str]]], mode: str,
+                  model: str, temperature: float, use_cache: bool):
+    """批量查询缓存。
+
+    Returns:
+        (结果列表, 缓存键列表, 未命中的请求下标列表) 元组
+    """
+    results = [None] * len(messages_list)
+    keys = [None] * len(messages_list)
+    pending = []
+    for idx, messages in enumerate(messages_list):
+        if _cacheable(use_cache, temperature):
+            keys[idx] = _cache_key(messages, mode, model, temperature)
+            cached = llm_cache.get(keys[idx])
+            if cached is not None:
+                result, error = _postprocess(cached, mode)
+                if error is None:
+                    results[idx] = result
+                    continue
+                llm_cache.evict(keys[idx])
+        pending.append(idx)
+    return results, keys, pending
+
+
+def _store_result(results: List[Any], keys: List[Optional[str]], idx: int,
+                  content: Optional[str], mode: str) -> None:
+    """把批量请求中一条响应的处理结果写入 results 并写入缓存。
+
+    内容过滤或拒答时 content 为 None，或JSON模式下输出无法解析时，记为该条
+    请求失败，results[idx] 保持 None。批量路径不做反馈重试，需要时可对这些
+    请求单独调用 chat_single。
+    """
+    if not isinstance(content, str):
+        print(f"Request {idx} failed: "
+              "empty response (refusal or content filter)")
+        return
+    result, error = _postprocess(content, mode)
+    if error is not None:
+        print(f"Request {idx} failed: {error}")
+        return
+    results[idx] = result
+    if keys[idx] is not None:
+        llm_cache.set(keys[idx], content)
+
+
+class _RateLimiter:
+    """按每分钟请求数均匀放行请求。"""
+
+    def __init__(self, rpm: Optional[int] = None):
+        self.interval = 60.0 / rpm if rpm else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def _achat(aclient: AsyncOpenAI, messages: List[Dict[str, str]],
+                 mode: str, model: str, temperature: float,
+                 semaphore: asyncio.Semaphore, limiter: _RateLimiter,
+                 max_attempts: int = 5) -> str:
+    """异步发送单个请求，遇到限流、超时、连接错误或5xx时指数退避重试。"""
+    for attempt in range(max_attempts):
+        await limiter.wait()
+        async with semaphore:
+            try:
+                response = await aclient.chat.completions.create(
+                    **_request_params(messages, mode, model, temperature))
+                return response.choices[0].message.content
+            except _TRANSIENT_ERRORS:
+                if attempt == max_attempts - 1:
+                    raise
+        await asyncio.sleep(random.uniform(0, min(40, 2 ** attempt)))
+
+
+async def _achat_pending(messages_list: List[List[Dict[str, str]]],
+                         mode: str, model: str, temperature: float,
+                         results: List[Any], keys: List[Optional[str]],
+                         pending: List[int], concurrency: int = 8,
+                         rpm: Optional[int] = None) -> None:
+    """并发发送 pending 中的请求，结果就地写入 results 并写入缓存。"""
+    if not pending:
+        return
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = _RateLimiter(rpm)
+    # 异步连接池绑定在当前事件循环上，每次 asyncio.run 都要新建
+    async with AsyncOpenAI(http_client=DefaultAsyncHttpxClient(
+            http2=_HTTP2)) as aclient:
+        contents = await asyncio.gather(*[
+            _achat(aclient, messages_list[idx], mode, model, temperature,
+                   semaphore, limiter)
+            for idx in pending], return_exceptions=True)
+    for idx, content in zip(pending, contents):
+        if isinstance(content, BaseException):
+            print(f"Request {idx} failed: {content!r}")
+            continue
+        _store_result(results, keys, idx, content, mode)
+
+
+async def achat_parallel(messages_list: List[List[Dict[str, str]]],
+                         mode: str = "",
+                         model: str = DEFAULT_MODEL,
+                         temperature: float = 0,
+                         concurrency: int = 8,
+                         rpm: Optional[int] = None,
+                         use_cache: bool = True) -> List[Any]:
+    """并发发送多个聊天请求，参数与返回值同 chat_parallel。"""
+    if mode == "stream":
+        raise ValueError("chat_parallel does not support stream mode")
+    if mode == 'json_few_shot':
+        temperature = 0
+
+    results, keys, pending = _lookup_cache(messages_list, mode, model,
+                                           temperature, use_cache)
+    await _achat_pending(messages_list, mode, model, temperature, results,
+                         keys, pending, concurrency, rpm)
+    return results
+
+
+def chat_parallel(messages_list: List[List[Dict[str, str]]],
+                  mode: str = "",
+                  model: str = DEFAULT_MODEL,
+                  temperature: float = 0,
+                  concurrency: int = 8,
+                  rpm: Optional[int] = None,
+                  use_cache: bool = True) -> List[Any]:
+    """使用 AsyncOpenAI 并发发送多个聊天请求。
+
+    同时进行的请求数不超过 concurrency，总耗时约为单次最长延迟乘以
+    ceil(N / concurrency)，而不是所有延迟之和。已在事件循环中运行时请直接
+    await achat_parallel。
+
+    Args:
+        messages_list: 每个请求的消息列表
+        mode: 响应模式 ('json', 'json_few_shot', 或空字符串为普通模式)
+        model: 要使用的模型
+        temperature: 温度参数，控制响应随机性
+        concurrency: 最大并发请求数
+        rpm: 每分钟最多发送的请求数，None 表示不限制
+        use_cache: 是否使用磁盘缓存（只缓存 temperature 为 0 的请求）
+
+    Returns:
+        与 messages_list 顺序一致的结果列表，重试后仍失败、返回空内容或
+        JSON输出无法解析的请求对应 None，其余请求的结果照常返回并写入缓存
+    """
+    return asyncio.run(achat_parallel(
+        messages_list, mode=mode, model=model, temperature=temperature,
+        concurrency=concurrency, rpm=rpm, use_cache=use_cache))
+
+
+def chat_batch(messages_list: List[List[Dict[str, str]]],
+               mode: str = "",
+               model: str = DEFAULT_MODEL,
+               temperature: float = 0,
+               poll_interval: float = 30,
+               use_cache: bool = True) -> List[Any]:
+    """通过OpenAI Batch API批量发送聊天请求。
+
+    所有未命中缓存的请求写入一个JSONL文件一次性提交，然后轮询直到批任务结束，
+    费用约为逐条调用的一半，但可能需要最长24小时。未命中缓存的请求数少于
+    BATCH_MIN_REQUESTS 时退回并发调用。
+
+    Args:
+        messages_list: 每个请求的消息列表
+        mode: 响应模式 ('json', 'json_few_shot', 或空字符串为普通模式)
+        model: 要使用的模型
+        temperature: 温度参数，控制响应随机性
+        poll_interval: 轮询批任务状态的间隔秒数
+        use_cache: 是否使用磁盘缓存（只缓存 temperature 为 0 的请求）
+
+    Returns:
+        与 messages_list 顺序一致的结果列表，批任务中失败、返回空内容或
+        JSON输出无法解析的请求对应 None；批任务过期或被取消时返回已完成的部分
+
+    Raises:
+        RuntimeError: 批任务状态为 failed
+    """
+    if mode == "stream":
+        raise ValueError("Batch API does not support stream mode")
+    if mode == 'json_few_shot':
+        temperature = 0
+
+    results, keys, pending = _lookup_cache(messages_list, mode, model,
+                                           temperature, use_cache)
+    if len(pending) < BATCH_MIN_REQUESTS:
+        asyncio.run(_achat_pending(messages_list, mode, model, temperature,
+                                   results, keys, pending))
+        return results
+
+    lines = [_json_dumps({
+        'custom_id': str(idx),
+        'method': 'POST',
+        'url': '/v1/chat/completions',
+        'body': _request_params(messages_list[idx], mode, model, temperature),
+    }) for idx in pending]
+
+    batch_file = client.files.create(
+        file=('batch.jsonl', '\n'.join(lines).encode('utf-8')),
+        purpose='batch')
+    batch = client.batches.create(input_file_id=batch_file.id,
+                                  endpoint='/v1/chat/completions',
+                                  completion_window='24h')
+    while batch.status not in ('completed', 'failed', 'expired', 'cancelled'):
+        time.sleep(poll_interval)
+        batch = client.batches.retrieve(batch.id)
+    if batch.status == 'failed':
+        raise RuntimeError(f"Batch {batch.id} ended with status {batch.status}")
+    if batch.status != 'completed':
+        # 过期或取消的批任务中已完成的请求同样计费，照常读取并缓存
+        print(f"Batch {batch.id} ended with status {batch.status}, "
+              "returning partial results")
+
+    if batch.error_file_id:
+        error_lines = client.files.content(batch.error_file_id).text.splitlines()
+        if error_lines:
+            print(f"Batch {batch.id}: {len(error_lines)} requests failed, "
+                  f"first error: {error_lines[0]}")
+    if not batch.output_file_id:
+        return results
+
+    output = client.files.content(batch.output_file_id).text
+    for line in output.splitlines():
+        item = _json_loads(line)
+        response = item.get('response') or {}
+        if response.get('status_code') != 200:
+            print(f"Batch request {item.get('custom_id')} failed: "
+                  f"{item.get('error') or response}")
+            continue
+        idx = int(item['custom_id'])
+        content = response['body']['choices'][0]['message']['content']
+        _store_result(results, keys, idx, content, mode)
+    return results
 
 
 def format_list_string(input_str: str) -> str:
@@ -92,7 +517,7 @@ def format_list_string(input_str: str) -> str:
     Returns:
         格式化后的JSON字符串
     """
-    match = re.search(r'\{\s*"[^"]+"\s*:\s*\[(.*?)\]\s*\}', input_str)
+    match = _LIST_OBJECT_RE.search(input_str)
     if not match:
         return "Invalid input format"
 
@@ -101,7 +526,7 @@ def format_list_string(input_str: str) -> str:
 
     formatted_elements = []
     for elem in elements:
-        if not re.match(r'^([\'"])(.*)\1$', elem):
+        if not _QUOTED_RE.match(elem):
             elem = f'"{elem}"'
         formatted_elements.append(elem)
 
@@ -118,7 +543,7 @@ def extract_json_and_similar_words(text: str) -> Dict[str, Any]:
         提取的JSON数据字典
     """
     try:
-        json_match = re.search(r'```json\s*({.*?})\s*```', text, re.DOTALL)
+        json_match = _JSON_FENCE_RE.search(text)
 
         if not json_match:
             raise ValueError("No JSON data found in the text.")
@@ -135,8 +560,12 @@ def extract_json_and_similar_words(text: str) -> Dict[str, Any]:
         return {"error": str(e)}
 
 
-def run_examples():
-    """运行所有模式的示例，展示不同API调用方式。"""
+def run_examples(use_cache: bool = True):
+    """运行所有模式的示例，展示不同API调用方式。
+
+    Args:
+        use_cache: 是否使用磁盘缓存（只缓存 temperature 为 0 的请求）
+    """
 
     # 基础消息模板，用于所有示例
     base_messages = [
@@ -149,7 +578,7 @@ def run_examples():
     standard_messages.append(
         message_template('user', '你是谁'))
 
-    standard_response = chat_single(standard_messages)
+    standard_response = chat_single(standard_messages, use_cache=use_cache)
     print(f"响应:\n{standard_response}\n")
 
     print("\n===== 2. 流式响应模式示例 =====")
@@ -159,44 +588,41 @@ def run_examples():
 
     stream_response = chat_single(stream_messages, mode="stream")
 
-    collected_response = ""
+    collected_chunks = []
     print("流式响应:")
     for chunk in stream_response:
-        if chunk.choices[0].delta.content is not None:
-            content_chunk = chunk.choices[0].delta.content
-            collected_response += content_chunk
+        content_chunk = chunk.choices[0].delta.content
+        if content_chunk is not None:
+            collected_chunks.append(content_chunk)
             print(content_chunk, end="", flush=True)
 
     print("\n\n完整收集的响应:")
-    print(collected_response)
+    print("".join(collected_chunks))
 
     print("\n===== 3. JSON响应模式示例 =====")
     json_messages = base_messages.copy()
     json_messages.append(message_template('user',
                                           '以JSON格式提供Python三个主要数据结构的名称和简短描述。'))
 
-    json_response = chat_single(json_messages, mode="json")
+    json_response = chat_single(json_messages, mode="json",
+                                use_cache=use_cache)
     print(f"JSON响应:\n{json_response}\n")
     print(f"解析后的JSON:\n{json.loads(json_response)}\n")
 
     print(
         "\n===== 4. JSON Few-Shot示例 =====")  # 可以保留reasoning部分，减少结构输出文本导致的Performance下降
     few_shot_messages = base_messages.copy()
-    few_shot_messages.append(message_template('user',
-                                              '''请提供与"programming"类似的词。
-
-                                              请以以下JSON格式回复:
-                                              ```json
-                                              {
-                                                "similar_words": ["coding", "development", ...]
-                                              }
-                                              ```
-                                              '''))
+    few_shot_messages.append(message_template(
+        'user', _SIMILAR_WORDS_PROMPT.format_map({'word': 'programming'})))
 
     few_shot_response = chat_single(few_shot_messages, mode="json_few_shot",
-                                    verbose=True)
+                                    verbose=True, use_cache=use_cache)
     print(f"处理后的响应:\n{few_shot_response}\n")
 
 
 if __name__ == "__main__":
-    run_examples()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--no-cache', action='store_true',
+                        help='跳过磁盘缓存，总是调用API')
+    args = parser.parse_args()
+    run_examples(use_cache=not args.no_cache)
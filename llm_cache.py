@@ -0,0 +1,92 @@
+import functools
+import hashlib
+import os
+from typing import Optional
+
+CACHE_DIR = os.path.join("data", "llm_cache")
+
+
+def make_key(*fields: str) -> str:
+    """根据多个字段计算内容寻址的缓存键。
+
+    每个字段前添加 8 字节长度前缀，避免不同字段拼接后产生相同字节串。
+
+    Args:
+        fields: 参与计算的字段，例如模型名、提示版本、消息内容
+
+    Returns:
+        sha256 十六进制摘要
+    """
+    h = hashlib.sha256()
+    for field in fields:
+        data = field.encode('utf-8')
+        h.update(len(data).to_bytes(8, 'big'))
+        h.update(data)
+    return h.hexdigest()
+
+
+@functools.lru_cache(maxsize=32)
+def _ensure_dir(path: str) -> None:
+    """每个目录只调用一次 os.makedirs。"""
+    os.makedirs(path, exist_ok=True)
+
+
+def _path(key: str) -> str:
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+
+def get(key: str) -> Optional[str]:
+    """读取缓存的响应。
+
+    Args:
+        key: 由 make_key 生成的缓存键
+
+    Returns:
+        缓存内容，未命中时返回 None
+    """
+    try:
+        with open(_path(key), 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def set(key: str, value: str) -> None:
+    """写入缓存。先写临时文件再原子替换，避免并发读取到半个文件。
+
+    Args:
+        key: 由 make_key 生成的缓存键
+        value: 要缓存的响应内容
+    """
+    _ensure_dir(CACHE_DIR)
+    path = _path(key)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        f = open(tmp_path, 'w', encoding='utf-8')
+    except FileNotFoundError:
+        # 缓存目录在运行期间被删除
+        _ensure_dir.cache_clear()
+        _ensure_dir(CACHE_DIR)
+        f = open(tmp_path, 'w', encoding='utf-8')
+    try:
+        with f:
+            f.write(value)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def evict(key: str) -> None:
+    """删除失效的缓存条目。
+
+    Args:
+        key: 由 make_key 生成的缓存键
+    """
+    try:
+        os.remove(_path(key))
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,351 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+from openai import APITimeoutError
+from pydantic import BaseModel
+
+import fake_api
+import llm_cache
+
+
+def _response(content):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class FakeCompletions:
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = []
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        return _response(self.replies.pop(0))
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "CACHE_DIR", str(tmp_path / "llm_cache"))
+    monkeypatch.setattr(fake_api.time, "sleep", lambda seconds: None)
+    return tmp_path / "llm_cache"
+
+
+def _fake_client(monkeypatch, replies):
+    completions = FakeCompletions(replies)
+    monkeypatch.setattr(fake_api, "client", SimpleNamespace(
+        chat=SimpleNamespace(completions=completions)))
+    return completions
+
+
+def _messages(text="hi"):
+    return [fake_api.message_template('user', text)]
+
+
+def test_chat_single_cache_hit_and_miss(monkeypatch):
+    completions = _fake_client(monkeypatch, ['{"a": 1}', '{"a": 2}'])
+
+    assert fake_api.chat_single(_messages(), mode="json") == '{"a": 1}'
+    assert fake_api.chat_single(_messages(), mode="json") == '{"a": 1}'
+    assert len(completions.calls) == 1
+
+    assert fake_api.chat_single(_messages("other"), mode="json") == '{"a": 2}'
+    assert len(completions.calls) == 2
+
+
+def test_cache_key_normalises_temperature():
+    assert (fake_api._cache_key(_messages(), "", "m", 0)
+            == fake_api._cache_key(_messages(), "", "m", 0.0))
+
+
+def test_chat_single_evicts_invalid_cache_entry(monkeypatch):
+    completions = _fake_client(monkeypatch, ['{"a": 1}'])
+    key = fake_api._cache_key(_messages(), "json", fake_api.DEFAULT_MODEL, 0)
+    llm_cache.set(key, "not json")
+
+    assert fake_api.chat_single(_messages(), mode="json") == '{"a": 1}'
+    assert len(completions.calls) == 1
+    assert llm_cache.get(key) == '{"a": 1}'
+
+
+def test_chat_single_does_not_cache_none_content(monkeypatch, cache_dir):
+    completions = _fake_client(monkeypatch, [None, "text"])
+
+    assert fake_api.chat_single(_messages()) is None
+    assert not cache_dir.exists()
+    assert fake_api.chat_single(_messages()) == "text"
+    assert len(completions.calls) == 2
+
+
+def test_chat_single_skips_cache_when_sampling(monkeypatch):
+    completions = _fake_client(monkeypatch, ["first", "second"])
+
+    assert fake_api.chat_single(_messages(), temperature=0.7) == "first"
+    assert fake_api.chat_single(_messages(), temperature=0.7) == "second"
+    assert len(completions.calls) == 2
+
+
+def _fake_batch_client(monkeypatch, build_output, error_lines=(),
+                       status="completed"):
+    uploaded = {}
+
+    def create_file(file, purpose):
+        uploaded["lines"] = [json.loads(line)
+                             for line in file[1].decode().splitlines()]
+        return SimpleNamespace(id="file-in")
+
+    def content(file_id):
+        if file_id == "file-err":
+            return SimpleNamespace(text="\n".join(error_lines))
+        return SimpleNamespace(text="\n".join(
+            json.dumps(item) for item in build_output(uploaded["lines"])))
+
+    output_file_id = "file-out" if build_output else None
+    batch = SimpleNamespace(id="batch", status=status,
+                            output_file_id=output_file_id,
+                            error_file_id="file-err" if error_lines else None)
+    monkeypatch.setattr(fake_api, "client", SimpleNamespace(
+        files=SimpleNamespace(create=create_file, content=content),
+        batches=SimpleNamespace(create=lambda **kwargs: batch,
+                                retrieve=lambda batch_id: batch)))
+    monkeypatch.setattr(fake_api, "BATCH_MIN_REQUESTS", 2)
+    return uploaded
+
+
+def _batch_line(custom_id, content, status_code=200):
+    return {"custom_id": custom_id, "response": {
+        "status_code": status_code,
+        "body": {"choices": [{"message": {"content": content}}]}}}
+
+
+def _echo(lines):
+    return [_batch_line(line["custom_id"],
+                        "r" + line["body"]["messages"][0]["content"])
+            for line in lines]
+
+
+def test_chat_batch_keeps_input_order(monkeypatch):
+    def build_output(lines):
+        items = _echo(lines)
+        items[0] = _batch_line(items[0]["custom_id"], "", status_code=500)
+        return reversed(items)
+
+    _fake_batch_client(monkeypatch, build_output)
+    results = fake_api.chat_batch([_messages(str(i)) for i in range(4)])
+    assert results == [None, "r1", "r2", "r3"]
+
+
+def test_chat_batch_only_submits_cache_misses(monkeypatch):
+    uploaded = _fake_batch_client(monkeypatch, _echo)
+    fake_api.chat_batch([_messages(str(i)) for i in range(2)])
+
+    results = fake_api.chat_batch([_messages(str(i)) for i in range(4)])
+    assert results == ["r0", "r1", "r2", "r3"]
+    assert [line["custom_id"] for line in uploaded["lines"]] == ["2", "3"]
+
+
+def test_chat_batch_without_output_file(monkeypatch, capsys):
+    _fake_batch_client(monkeypatch, None, error_lines=['{"e": 1}', '{"e": 2}'])
+
+    assert fake_api.chat_batch([_messages(str(i)) for i in range(3)]) == [
+        None, None, None]
+    assert "2 requests failed" in capsys.readouterr().out
+
+
+def _fake_async_client(monkeypatch, reply):
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        return _response(reply(kwargs["messages"][0]["content"]))
+
+    class FakeAsyncOpenAI:
+        def __init__(self, **kwargs):
+            self.chat = SimpleNamespace(
+                completions=SimpleNamespace(create=create))
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    monkeypatch.setattr(fake_api, "AsyncOpenAI", FakeAsyncOpenAI)
+    monkeypatch.setattr(fake_api, "DefaultAsyncHttpxClient",
+                        lambda **kwargs: None)
+    return calls
+
+
+def test_chat_parallel_keeps_partial_results(monkeypatch):
+    def reply(text):
+        if text == "1":
+            raise RuntimeError("boom")
+        return "r" + text
+
+    calls = _fake_async_client(monkeypatch, reply)
+    results = fake_api.chat_parallel([_messages(str(i)) for i in range(3)])
+    assert results == ["r0", None, "r2"]
+
+    assert fake_api.chat_parallel([_messages("0"), _messages("2")]) == [
+        "r0", "r2"]
+    assert len(calls) == 3
+
+
+def test_chat_parallel_none_content_is_a_failure(monkeypatch, capsys):
+    _fake_async_client(monkeypatch,
+                       lambda text: None if text == "1" else '{"v": 1}')
+
+    results = fake_api.chat_parallel([_messages(str(i)) for i in range(3)],
+                                     mode="json")
+    assert results == ['{"v": 1}', None, '{"v": 1}']
+    assert "Request 1 failed" in capsys.readouterr().out
+
+
+def test_chat_batch_none_content_is_a_failure(monkeypatch):
+    def build_output(lines):
+        items = _echo(lines)
+        items[1]["response"]["body"]["choices"][0]["message"]["content"] = None
+        return items
+
+    _fake_batch_client(monkeypatch, build_output)
+    assert fake_api.chat_batch([_messages(str(i)) for i in range(3)]) == [
+        "r0", None, "r2"]
+
+
+def test_chat_batch_small_runs_use_parallel_path(monkeypatch):
+    _fake_async_client(monkeypatch, lambda text: "a" + text)
+    assert fake_api.chat_batch([_messages("x")]) == ["ax"]
+
+
+def test_achat_retries_transient_errors(monkeypatch):
+    monkeypatch.setattr(fake_api.random, "uniform", lambda a, b: 0)
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        if len(calls) < 3:
+            raise APITimeoutError(request=None)
+        return _response("done")
+
+    aclient = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    async def run():
+        return await fake_api._achat(
+            aclient, _messages(), "", "m", 0, asyncio.Semaphore(1),
+            fake_api._RateLimiter())
+
+    assert asyncio.run(run()) == "done"
+    assert len(calls) == 3
+
+
+def test_rate_limiter_spaces_requests():
+    async def run(limiter, n):
+        start = time.monotonic()
+        for _ in range(n):
+            await limiter.wait()
+        return time.monotonic() - start
+
+    assert asyncio.run(run(fake_api._RateLimiter(), 10)) < 0.01
+    assert asyncio.run(run(fake_api._RateLimiter(rpm=3000), 3)) >= 0.035
+
+
+class Item(BaseModel):
+    x: int
+
+
+def test_request_params_json_schema():
+    params = fake_api._request_params(_messages(), "json", "m", 0, Item)
+    assert params["response_format"] == {
+        "type": "json_schema",
+        "json_schema": {"name": "Item", "schema": Item.model_json_schema()}}
+    assert fake_api._request_params(_messages(), "json", "m", 0)[
+        "response_format"] == {"type": "json_object"}
+
+
+def test_feedback_retry_appends_error(monkeypatch):
+    completions = _fake_client(monkeypatch, ["not json", '{"ok": true}'])
+
+    assert fake_api.chat_single(_messages(), mode="json") == '{"ok": true}'
+    retried = completions.calls[1]["messages"]
+    assert retried[1] == {'role': 'assistant', 'content': 'not json'}
+    assert "Invalid JSON" in retried[2]["content"]
+
+
+def test_feedback_returns_schema_instance(monkeypatch):
+    _fake_client(monkeypatch, ['{"x": 1}'])
+    assert fake_api.chat_single(_messages(), mode="json",
+                                schema=Item) == Item(x=1)
+
+
+def test_feedback_exhaustion_raises(monkeypatch, cache_dir):
+    completions = _fake_client(monkeypatch, ['{"y": 3}'] * 3)
+
+    with pytest.raises(fake_api.OutputValidationError) as excinfo:
+        fake_api.chat_single(_messages(), mode="json", schema=Item)
+    assert excinfo.value.content == '{"y": 3}'
+    assert len(completions.calls) == fake_api.FEEDBACK_ATTEMPTS
+    assert not cache_dir.exists()
+
+
+def test_fallback_model_output_not_cached(monkeypatch, cache_dir):
+    completions = _fake_client(monkeypatch, ["bad", "bad", '{"x": 1}'])
+
+    result = fake_api.chat_single(_messages(), mode="json", schema=Item)
+    assert result == Item(x=1)
+    assert completions.calls[-1]["model"] == fake_api.FALLBACK_MODEL
+    assert not cache_dir.exists()
+
+
+def test_no_fallback_for_explicit_model(monkeypatch):
+    completions = _fake_client(monkeypatch, ["bad", "bad", '{"x": 1}'])
+
+    fake_api.chat_single(_messages(), mode="json", model="custom", schema=Item)
+    assert {call["model"] for call in completions.calls} == {"custom"}
+
+
+def test_feedback_retries_empty_response(monkeypatch):
+    completions = _fake_client(monkeypatch, [None, '{"x": 2}'])
+
+    assert fake_api.chat_single(_messages(), mode="json",
+                                schema=Item) == Item(x=2)
+    retried = completions.calls[1]["messages"]
+    assert retried[1] == {'role': 'assistant', 'content': ''}
+    assert "Empty response" in retried[2]["content"]
+
+
+def test_feedback_exhaustion_on_refusal_raises(monkeypatch):
+    _fake_client(monkeypatch, [None] * 3)
+
+    with pytest.raises(fake_api.OutputValidationError) as excinfo:
+        fake_api.chat_single(_messages(), mode="json", schema=Item)
+    assert excinfo.value.content is None
+
+
+def test_batch_paths_map_unparseable_json_to_none(monkeypatch):
+    _fake_async_client(monkeypatch,
+                       lambda text: "not json" if text == "0" else '{"v": 1}')
+    assert fake_api.chat_parallel([_messages("0"), _messages("1")],
+                                  mode="json") == [None, '{"v": 1}']
+
+    _fake_batch_client(monkeypatch, _echo)
+    assert fake_api.chat_batch([_messages("0"), _messages("1")],
+                               mode="json_few_shot") == [None, None]
+
+
+@pytest.mark.parametrize("status", ["expired", "cancelled"])
+def test_chat_batch_returns_partial_results(monkeypatch, status):
+    _fake_batch_client(monkeypatch, lambda lines: _echo(lines)[:1],
+                       status=status)
+    assert fake_api.chat_batch([_messages(str(i)) for i in range(3)]) == [
+        "r0", None, None]
+    assert llm_cache.get(fake_api._cache_key(
+        _messages("0"), "", fake_api.DEFAULT_MODEL, 0)) == "r0"
+
+
+def test_chat_batch_failed_status_raises(monkeypatch):
+    _fake_batch_client(monkeypatch, _echo, status="failed")
+    with pytest.raises(RuntimeError):
+        fake_api.chat_batch([_messages(str(i)) for i in range(2)])
@@ -0,0 +1,40 @@
+import pytest
+
+import llm_cache
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "CACHE_DIR", str(tmp_path / "llm_cache"))
+    return tmp_path / "llm_cache"
+
+
+def test_make_key_length_prefixes_fields():
+    assert llm_cache.make_key("ab", "c") != llm_cache.make_key("a", "bc")
+    assert llm_cache.make_key("a", "b") == llm_cache.make_key("a", "b")
+
+
+def test_roundtrip_and_evict():
+    key = llm_cache.make_key("k")
+    assert llm_cache.get(key) is None
+    llm_cache.set(key, "value")
+    assert llm_cache.get(key) == "value"
+    llm_cache.evict(key)
+    assert llm_cache.get(key) is None
+    llm_cache.evict(key)
+
+
+def test_set_recreates_deleted_directory(cache_dir):
+    llm_cache.set("a", "1")
+    for path in cache_dir.iterdir():
+        path.unlink()
+    cache_dir.rmdir()
+
+    llm_cache.set("b", "2")
+    assert llm_cache.get("b") == "2"
+
+
+def test_failed_write_leaves_no_tmp_file(cache_dir):
+    with pytest.raises(TypeError):
+        llm_cache.set("a", None)
+    assert list(cache_dir.iterdir()) == []